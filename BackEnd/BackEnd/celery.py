@@ -0,0 +1,18 @@
+"""
+Configuración de Celery para el proyecto BackEnd.
+
+El procesamiento de planos (rasterizado, detección de bordes y contornos) se
+ejecuta en workers de Celery para no bloquear los workers web. Iniciar con:
+
+    celery -A BackEnd worker -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'BackEnd.settings')
+
+app = Celery('BackEnd')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
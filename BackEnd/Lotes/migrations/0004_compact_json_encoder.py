@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-15 09:33
+
+import Planos.encoders
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Lotes", "0003_lote_medidas_lados"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="lote",
+            name="vertices",
+            field=models.JSONField(
+                default=list,
+                encoder=Planos.encoders.CompactJSONEncoder,
+                help_text="Coordenadas de los vértices del lote",
+            ),
+        ),
+    ]
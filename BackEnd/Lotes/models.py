@@ -1,4 +1,5 @@
 from django.db import models
+from Planos.encoders import CompactJSONEncoder
 from Planos.models import Plano
 
 class Lote(models.Model):
@@ -11,7 +12,7 @@ class Lote(models.Model):
     plano = models.ForeignKey(Plano, on_delete=models.CASCADE, related_name='lotes', null=True, blank=True)
     nombre = models.CharField(max_length=255, blank=True, null=True)
     descripcion = models.TextField(blank=True, null=True)
-    vertices = models.JSONField(default=list, help_text="Coordenadas de los vértices del lote")
+    vertices = models.JSONField(default=list, encoder=CompactJSONEncoder, help_text="Coordenadas de los vértices del lote")
     area = models.FloatField(null=True, blank=True)
     medidas_lados = models.TextField(blank=True, null=True, help_text="Medidas de los lados del lote")
     precio = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
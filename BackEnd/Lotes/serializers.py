@@ -1,6 +1,31 @@
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
 from rest_framework import serializers
 from .models import Lote
 
+def nombres_automaticos(cantidad):
+    """Genera `cantidad` nombres 'Lote-NNN' consecutivos a partir del siguiente id."""
+    # Solo se consulta el id máximo, sin cargar una instancia completa
+    max_id = Lote.objects.aggregate(max_id=Max('id'))['max_id']
+    next_id = (max_id or 0) + 1
+    return [f'Lote-{next_id + offset:03d}' for offset in range(cantidad)]
+
+class LoteBulkListSerializer(serializers.ListSerializer):
+    """Crea varios lotes con inserciones por lotes (bulk_create) en lugar de uno por uno."""
+    batch_size = 500
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            nombres = nombres_automaticos(len(validated_data))
+            lotes = []
+            for nombre, datos in zip(nombres, validated_data):
+                if not datos.get('nombre'):
+                    datos['nombre'] = nombre
+                lotes.append(Lote(**datos))
+            
+            return Lote.objects.bulk_create(lotes, batch_size=self.batch_size)
+
 class LoteSerializer(serializers.ModelSerializer):
     area_calculada = serializers.SerializerMethodField()
     
@@ -17,29 +42,37 @@ class LoteSerializer(serializers.ModelSerializer):
             'area': {'required': False},
             'precio': {'required': False},
         }
+        list_serializer_class = LoteBulkListSerializer
 
     def get_area_calculada(self, obj):
         """Calcula el área del polígono usando los vértices"""
         if not obj.vertices or len(obj.vertices) < 3:
             return None
         
-        # Fórmula del área usando el algoritmo de Shoelace
-        vertices = obj.vertices
-        n = len(vertices)
-        area = 0
-        
-        for i in range(n):
-            j = (i + 1) % n
-            area += vertices[i][0] * vertices[j][1]
-            area -= vertices[j][0] * vertices[i][1]
+        # Fórmula del área usando el algoritmo de Shoelace, vectorizada con NumPy
+        try:
+            vertices = np.asarray(obj.vertices, dtype=np.float64)
+        except (TypeError, ValueError):  # Vértices irregulares o no numéricos
+            return None
+        if vertices.ndim != 2 or vertices.shape[1] < 2:
+            return None
         
-        return abs(area) / 2.0
+        x, y = vertices[:, 0], vertices[:, 1]
+        area = np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))
+        return float(abs(area) / 2.0)
 
     def create(self, validated_data):
         # Generar nombre automático si no se proporciona
         if not validated_data.get('nombre'):
-            last_lote = Lote.objects.last()
-            next_id = (last_lote.id + 1) if last_lote else 1
-            validated_data['nombre'] = f'Lote-{next_id:03d}'
+            validated_data['nombre'] = nombres_automaticos(1)[0]
         
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+class LoteListSerializer(serializers.ModelSerializer):
+    """Resumen de lote para listados: omite vértices, medidas y descripción."""
+    class Meta:
+        model = Lote
+        fields = [
+            'id', 'plano', 'nombre', 'area', 'precio', 'estado',
+            'creado', 'actualizado'
+        ]
\ No newline at end of file
@@ -1,3 +1,73 @@
-from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from .models import Lote
+
+VERTICES = [[0, 0], [10, 0], [10, 5], [0, 5]]
+
+class LoteBulkCreateTests(APITestCase):
+    url = reverse('crear-lotes-bulk')
+
+    def test_crea_lotes_y_devuelve_ids(self):
+        datos = [
+            {'nombre': 'Esquina', 'vertices': VERTICES},
+            {'vertices': VERTICES, 'precio': '1500.00'},
+        ]
+        response = self.client.post(self.url, datos, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 2)
+        ids = [lote['id'] for lote in response.data]
+        self.assertTrue(all(ids))
+        self.assertEqual(set(Lote.objects.values_list('id', flat=True)), set(ids))
+        self.assertEqual(response.data[1]['area_calculada'], 50.0)
+
+    def test_nombres_automaticos_continuan_desde_el_id_maximo(self):
+        existente = Lote.objects.create(nombre='Previo')
+        datos = [{'vertices': VERTICES}, {'nombre': 'Manual'}, {'vertices': VERTICES}]
+        response = self.client.post(self.url, datos, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        nombres = [lote['nombre'] for lote in response.data]
+        self.assertEqual(nombres, [
+            f'Lote-{existente.id + 1:03d}', 'Manual', f'Lote-{existente.id + 3:03d}'
+        ])
+
+    def test_rechaza_cuerpo_que_no_es_lista(self):
+        response = self.client.post(self.url, {'vertices': VERTICES}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Lote.objects.exists())
+
+    def test_creacion_individual_usa_el_mismo_nombre_automatico(self):
+        existente = Lote.objects.create(nombre='Previo')
+        response = self.client.post(reverse('listar-crear-lotes'), {'vertices': VERTICES}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['nombre'], f'Lote-{existente.id + 1:03d}')
+
+class LoteListadoTests(APITestCase):
+    url = reverse('listar-crear-lotes')
+
+    def setUp(self):
+        Lote.objects.create(nombre='Lote-001', vertices=VERTICES, descripcion='Frente al parque')
+
+    def test_listado_resumido_omite_vertices(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lote = response.data[0]
+        self.assertEqual(lote['nombre'], 'Lote-001')
+        self.assertNotIn('vertices', lote)
+        self.assertNotIn('descripcion', lote)
+        self.assertNotIn('area_calculada', lote)
+
+    def test_full_devuelve_el_lote_completo(self):
+        response = self.client.get(self.url, {'full': 1})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lote = response.data[0]
+        self.assertEqual(lote['vertices'], VERTICES)
+        self.assertEqual(lote['descripcion'], 'Frente al parque')
+        self.assertEqual(lote['area_calculada'], 50.0)
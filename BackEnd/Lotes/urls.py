@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import LoteListCreateAPIView, LoteDetailAPIView
+from .views import LoteListCreateAPIView, LoteDetailAPIView, LoteBulkCreateAPIView
 
 urlpatterns = [
     path('', LoteListCreateAPIView.as_view(), name='listar-crear-lotes'),
+    path('bulk/', LoteBulkCreateAPIView.as_view(), name='crear-lotes-bulk'),
     path('<int:pk>/', LoteDetailAPIView.as_view(), name='detalle-lote'),
 ]
\ No newline at end of file
@@ -1,11 +1,42 @@
-from rest_framework import generics
+from rest_framework import generics, status
+from rest_framework.response import Response
 from .models import Lote
-from .serializers import LoteSerializer
+from .serializers import LoteSerializer, LoteListSerializer
 
 class LoteListCreateAPIView(generics.ListCreateAPIView):
+    # 'plano' se serializa como PK leyendo plano_id, así que no hay consultas N+1;
+    # select_related('plano') solo agregaría un JOIN con los JSONField del plano
     queryset = Lote.objects.all()
     serializer_class = LoteSerializer
 
+    def _es_listado_resumido(self):
+        """El listado devuelve un resumen salvo que se pida ?full=1."""
+        return self.request.method == 'GET' and self.request.query_params.get('full') != '1'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self._es_listado_resumido():
+            queryset = queryset.only(*LoteListSerializer.Meta.fields)
+        return queryset
+
+    def get_serializer_class(self):
+        if self._es_listado_resumido():
+            return LoteListSerializer
+        return super().get_serializer_class()
+
 class LoteDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Lote.objects.all()
-    serializer_class = LoteSerializer
\ No newline at end of file
+    serializer_class = LoteSerializer
+
+# Crear varios lotes en una sola petición (lista JSON) con inserciones por lotes
+class LoteBulkCreateAPIView(generics.GenericAPIView):
+    queryset = Lote.objects.all()
+    serializer_class = LoteSerializer
+
+    def post(self, request):
+        # many=True usa LoteBulkListSerializer, que inserta con bulk_create
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -3,66 +3,183 @@ import numpy as np
 from pdf2image import convert_from_bytes
 from PIL import Image
 import io
-from typing import List, Tuple, Dict
+import logging
+import os
+from typing import List, Tuple, Dict, Optional
 import math
-from collections import defaultdict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from scipy.spatial import cKDTree
 
-def distance_point_to_line(point: np.ndarray, line_start: np.ndarray, line_end: np.ndarray) -> float:
-    """Calcula la distancia perpendicular de un punto a una línea."""
-    if np.array_equal(line_start, line_end):
-        return np.linalg.norm(point - line_start)
-    
-    line_vec = line_end - line_start
-    point_vec = point - line_start
-    line_length = np.linalg.norm(line_vec)
-    line_unit_vec = line_vec / line_length
-    projection_length = np.dot(point_vec, line_unit_vec)
-    
-    if projection_length < 0:
-        return np.linalg.norm(point - line_start)
-    elif projection_length > line_length:
-        return np.linalg.norm(point - line_end)
-    else:
-        projection = line_start + projection_length * line_unit_vec
-        return np.linalg.norm(point - projection)
+logger = logging.getLogger(__name__)
 
-def ramer_douglas_peucker(points: np.ndarray, epsilon: float) -> List[np.ndarray]:
-    """Implementa el algoritmo de Ramer-Douglas-Peucker para simplificar una curva."""
-    if len(points) <= 2:
-        return points.tolist()
-    
-    # Encuentra el punto más lejano
-    dmax = 0
-    index = 0
-    end = len(points) - 1
-    
-    for i in range(1, end):
-        d = distance_point_to_line(points[i], points[0], points[end])
-        if d > dmax:
-            index = i
-            dmax = d
-    
-    # Si la distancia máxima es mayor que epsilon, recursivamente simplifica
-    if dmax > epsilon:
-        results1 = ramer_douglas_peucker(points[:index + 1], epsilon)
-        results2 = ramer_douglas_peucker(points[index:], epsilon)
-        return results1[:-1] + results2
-    else:
-        return [points[0], points[end]]
+# Pool compartido entre peticiones para simplificar contornos sin crear hilos en cada llamada;
+# por debajo de _MIN_CONTOURS_PARALLEL el costo de despacho supera la ganancia.
+# Tamaño pequeño por defecto: con Celery prefork cada proceso del worker tiene su propio pool
+# (PLANOS_SIMPLIFY_THREADS=1 desactiva el paralelismo)
+SIMPLIFY_THREADS = max(1, int(os.environ.get('PLANOS_SIMPLIFY_THREADS', 2)))
+_simplify_executor = ThreadPoolExecutor(max_workers=SIMPLIFY_THREADS, thread_name_prefix='simplify')
+_MIN_CONTOURS_PARALLEL = 64
+
+# Resolución de PDF con la que se calibraron los umbrales de área de CFG
+PDF_REFERENCE_DPI = 600
+
+def line_dists(points: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Calcula de forma vectorizada la distancia perpendicular de cada punto a la línea start-end."""
+    if np.all(start == end):
+        return np.linalg.norm(points - start, axis=1)
+    
+    vec = end - start
+    # El producto cruz 2D da el área del paralelogramo; dividir por la base da la altura
+    cross = vec[0] * (start[1] - points[:, 1]) - vec[1] * (start[0] - points[:, 0])
+    return np.abs(cross) / np.linalg.norm(vec)
+
+def ramer_douglas_peucker(points: np.ndarray, epsilon: float) -> np.ndarray:
+    """
+    Implementa el algoritmo de Ramer-Douglas-Peucker para simplificar una curva.
+    Versión iterativa: usa una pila explícita de rangos (lo, hi) y una máscara de
+    puntos conservados, evitando la recursión y el RecursionError en contornos largos.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n = len(points)
+    if n <= 2:
+        return points
+    
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo < 2:
+            continue
+        
+        # Encuentra el punto más lejano del segmento en una sola pasada vectorizada
+        dists = line_dists(points[lo + 1:hi], points[lo], points[hi])
+        k = int(np.argmax(dists))
+        
+        # Si la distancia máxima es mayor que epsilon, conservar el punto y subdividir
+        if dists[k] > epsilon:
+            index = lo + 1 + k
+            keep[index] = True
+            stack.append((lo, index))
+            stack.append((index, hi))
+    
+    return points[keep]
+
+def _rdp_numba(pts: np.ndarray, eps: float, keep: np.ndarray) -> None:
+    """
+    Núcleo de Ramer-Douglas-Peucker para compilar con Numba.
+    Marca en `keep` los puntos conservados usando pilas preasignadas de índices
+    y la distancia perpendicular calculada en línea, sin llamadas a NumPy.
+    """
+    n = pts.shape[0]
+    lo_stack = np.empty(n, np.int64)
+    hi_stack = np.empty(n, np.int64)
+    lo_stack[0] = 0
+    hi_stack[0] = n - 1
+    top = 1
+    
+    while top > 0:
+        top -= 1
+        lo = lo_stack[top]
+        hi = hi_stack[top]
+        if hi - lo < 2:
+            continue
+        
+        x1, y1 = pts[lo, 0], pts[lo, 1]
+        x2, y2 = pts[hi, 0], pts[hi, 1]
+        dx = x2 - x1
+        dy = y2 - y1
+        nrm = math.sqrt(dx * dx + dy * dy)
+        
+        dmax = -1.0
+        index = lo
+        for i in range(lo + 1, hi):
+            px, py = pts[i, 0], pts[i, 1]
+            if nrm == 0.0:
+                d = math.sqrt((px - x1) ** 2 + (py - y1) ** 2)
+            else:
+                d = abs(dx * (y1 - py) - dy * (x1 - px)) / nrm
+            if d > dmax:
+                dmax = d
+                index = i
+        
+        if dmax > eps:
+            keep[index] = True
+            lo_stack[top] = lo
+            hi_stack[top] = index
+            lo_stack[top + 1] = index
+            hi_stack[top + 1] = hi
+            top += 2
+
+_rdp_numba_compilado = None
+_rdp_numba_lock = threading.Lock()
 
-def simplify_contours(contours: List[np.ndarray], epsilon: float) -> List[List[List[int]]]:
-    """Simplifica una lista de contornos usando Ramer-Douglas-Peucker."""
+def _get_rdp_numba():
+    """
+    Compila el núcleo Numba en el primer uso: solo lo necesita use_python_rdp, así que
+    importar el módulo no paga la carga de Numba ni el JIT. Devuelve None sin Numba.
+    """
+    global _rdp_numba_compilado
+    with _rdp_numba_lock:
+        if _rdp_numba_compilado is None:
+            try:
+                from numba import njit
+            except ImportError:  # Numba es opcional: sin él se usa la versión NumPy de RDP
+                _rdp_numba_compilado = False
+            else:
+                _rdp_numba_compilado = njit(cache=True, nogil=True)(_rdp_numba)
+    return _rdp_numba_compilado or None
+
+def _simplify_contour(contour: np.ndarray, epsilon: float, use_python_rdp: bool) -> np.ndarray:
+    """Simplifica un contorno; cv2.approxPolyDP y el núcleo Numba liberan el GIL."""
+    if use_python_rdp:
+        points = np.ascontiguousarray(contour, dtype=np.float64).reshape(-1, 2)
+        rdp_numba = _get_rdp_numba()
+        if rdp_numba is not None:
+            keep = np.zeros(len(points), dtype=bool)
+            keep[0] = keep[-1] = True
+            rdp_numba(points, float(epsilon), keep)
+            return points[keep]
+        return ramer_douglas_peucker(points, epsilon)
+    
+    points = np.asarray(contour, dtype=np.int32).reshape(-1, 1, 2)
+    return cv2.approxPolyDP(points, epsilon, closed=False).reshape(-1, 2)
+
+def simplify_contours(contours: List[np.ndarray], epsilon: float, use_python_rdp: bool = False) -> List[List[List[int]]]:
+    """
+    Simplifica una lista de contornos usando Ramer-Douglas-Peucker.
+    Por defecto usa cv2.approxPolyDP; con use_python_rdp se usa la implementación
+    propia (Numba o NumPy), útil para comparar resultados entre ambas.
+    Con muchos contornos y varios núcleos, se simplifican en paralelo con hilos.
+    """
+    contours = [contour for contour in contours if len(contour) >= 2]  # Al menos 2 puntos
+    
+    if len(contours) >= _MIN_CONTOURS_PARALLEL and SIMPLIFY_THREADS > 1:
+        results = _simplify_executor.map(lambda c: _simplify_contour(c, epsilon, use_python_rdp), contours)
+    else:
+        results = (_simplify_contour(c, epsilon, use_python_rdp) for c in contours)
+    
     simplified = []
-    for contour in contours:
-        if len(contour) >= 2:  # Asegurarse de que hay al menos 2 puntos
-            points = np.array(contour)
-            simplified_contour = ramer_douglas_peucker(points, epsilon)
-            # Convertir a enteros y formato de lista
-            simplified_contour = [[int(x), int(y)] for x, y in simplified_contour]
-            if len(simplified_contour) >= 2:  # Solo agregar si hay al menos 2 puntos
-                simplified.append(simplified_contour)
+    for simplified_contour in results:
+        # Convertir a enteros y formato de lista
+        simplified_contour = simplified_contour.astype(np.int64).tolist()
+        if len(simplified_contour) >= 2:  # Solo agregar si hay al menos 2 puntos
+            simplified.append(simplified_contour)
     return simplified
 
+def _keep_spaced_points(points: np.ndarray, min_step: float) -> np.ndarray:
+    """Máscara de puntos a una distancia >= min_step del último punto conservado."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = True
+    prev_x, prev_y = points[0]
+    for i, (x, y) in enumerate(points[1:].tolist(), 1):
+        if math.hypot(x - prev_x, y - prev_y) >= min_step:
+            keep[i] = True
+            prev_x, prev_y = x, y
+    return keep
+
 def unify_close_points(contours: List[List[List[int]]], image_shape: Tuple[int, int], merge_distance_percent: float = 0.005) -> List[List[List[int]]]:
     """
     Unifica puntos que están muy cerca usando algoritmo optimizado de clustering espacial.
@@ -86,159 +203,111 @@ def unify_close_points(contours: List[List[List[int]]], image_shape: Tuple[int,
     if not contours:
         return contours
     
-    print(f"🔄 [OPTIMIZADO] Unificando puntos cercanos con distancia máxima: {merge_distance}px")
-    
-    # 1. Crear índice espacial para búsqueda eficiente
-    spatial_index = defaultdict(list)
-    grid_size = merge_distance * 2  # Tamaño de grilla para indexing espacial
-    
-    all_points = []
-    for contour_idx, contour in enumerate(contours):
-        for point_idx, point in enumerate(contour):
-            x, y = point[0], point[1]
-            
-            # Indexar por grilla espacial para búsqueda O(1)
-            grid_x = int(x // grid_size)
-            grid_y = int(y // grid_size)
-            grid_key = (grid_x, grid_y)
-            
-            point_data = {
-                'coords': (x, y),
-                'contour_idx': contour_idx,
-                'point_idx': point_idx,
-                'grid_key': grid_key,
-                'merged': False,
-                'cluster_id': None
-            }
-            
-            all_points.append(point_data)
-            spatial_index[grid_key].append(len(all_points) - 1)
-    
-    # 2. Clustering optimizado usando índice espacial
-    clusters = []
-    cluster_id = 0
-    
-    for point_idx, point_data in enumerate(all_points):
-        if point_data['merged']:
+    logger.info("🔄 [OPTIMIZADO] Unificando puntos cercanos con distancia máxima: %spx", merge_distance)
+    
+    # 1. Aplanar todos los puntos en arreglos contiguos (estructura de arreglos)
+    contour_lengths = np.fromiter((len(contour) for contour in contours), dtype=np.int64, count=len(contours))
+    offsets = np.concatenate(([0], np.cumsum(contour_lengths)))
+    pts = np.array([point[:2] for contour in contours for point in contour], dtype=np.float64).reshape(-1, 2)
+    contour_idx = np.repeat(np.arange(len(contours)), contour_lengths)
+    point_idx = np.arange(len(pts)) - offsets[contour_idx]
+    labels = np.full(len(pts), -1, dtype=np.int64)
+    
+    # Pares de puntos dentro del radio de fusión, calculados en C con un KD-tree, y su
+    # adyacencia en formato CSR: los vecinos de p son indices[indptr[p]:indptr[p + 1]]
+    pairs = cKDTree(pts).query_pairs(merge_distance, output_type='ndarray')
+    sources = np.concatenate((pairs[:, 0], pairs[:, 1]))
+    targets = np.concatenate((pairs[:, 1], pairs[:, 0]))
+    order = np.argsort(sources, kind='stable')
+    indices = targets[order]
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=len(pts)))))
+    
+    # 2. Clustering: cada semilla absorbe los puntos libres dentro del radio de fusión.
+    # Los puntos sin vecinos nunca forman cluster, así que solo se recorren los que tienen alguno;
+    # las listas de vecinos son cortas y se recorren más rápido como listas de Python que con NumPy
+    indices = indices.tolist()
+    indptr = indptr.tolist()
+    merged = bytearray(len(pts))
+    members = []
+    member_labels = []
+    cluster_count = 0
+    
+    for seed in np.flatnonzero(np.diff(indptr)).tolist():
+        if merged[seed]:
             continue
         
-        # Iniciar nuevo cluster
-        cluster = [point_idx]
-        point_data['merged'] = True
-        point_data['cluster_id'] = cluster_id
-        
-        # Buscar en grillas adyacentes (3x3)
-        grid_x, grid_y = point_data['grid_key']
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                adjacent_key = (grid_x + dx, grid_y + dy)
-                
-                for candidate_idx in spatial_index.get(adjacent_key, []):
-                    candidate = all_points[candidate_idx]
-                    
-                    if candidate['merged'] or candidate_idx == point_idx:
-                        continue
-                    
-                    # Calcular distancia euclidiana
-                    x1, y1 = point_data['coords']
-                    x2, y2 = candidate['coords']
-                    distance = math.sqrt((x1 - x2)**2 + (y1 - y2)**2)
-                    
-                    if distance <= merge_distance:
-                        cluster.append(candidate_idx)
-                        candidate['merged'] = True
-                        candidate['cluster_id'] = cluster_id
+        merged[seed] = True
+        candidates = [c for c in indices[indptr[seed]:indptr[seed + 1]] if not merged[c]]
         
-        if len(cluster) > 1:
-            clusters.append(cluster)
-            print(f"📍 Cluster {cluster_id}: {len(cluster)} puntos cercanos")
-        
-        cluster_id += 1
-    
-    print(f"📊 Clustering completado: {len(clusters)} clusters de puntos duplicados")
-    
-    # 3. Calcular centroides optimizados para cada cluster
-    cluster_centroids = {}
-    
-    for cluster in clusters:
-        # Usar weighted centroid para mejor precisión
-        total_weight = 0
-        weighted_x = 0
-        weighted_y = 0
+        if candidates:
+            for c in candidates:
+                merged[c] = True
+            members.append(seed)
+            members.extend(candidates)
+            member_labels.extend([cluster_count] * (len(candidates) + 1))
+            logger.debug("📍 Cluster %d: %d puntos cercanos", cluster_count, len(candidates) + 1)
+            cluster_count += 1
+    
+    labels[members] = member_labels
+    
+    logger.info("📊 Clustering completado: %d clusters de puntos duplicados", cluster_count)
+    
+    # 3. Calcular centroides ponderados de todos los clusters de forma vectorizada
+    unified_pts = pts.astype(np.int64)
+    
+    if cluster_count:
+        # Peso basado en posición (extremos tienen más peso)
+        is_endpoint = (point_idx == 0) | (point_idx == contour_lengths[contour_idx] - 1)
+        weights = np.where(is_endpoint, 2.0, 1.0)
         
-        for point_idx in cluster:
-            point_data = all_points[point_idx]
-            x, y = point_data['coords']
-            
-            # Peso basado en posición (extremos tienen más peso)
-            contour = contours[point_data['contour_idx']]
-            is_endpoint = (point_data['point_idx'] == 0 or 
-                          point_data['point_idx'] == len(contour) - 1)
-            weight = 2.0 if is_endpoint else 1.0
-            
-            weighted_x += x * weight
-            weighted_y += y * weight
-            total_weight += weight
+        members = np.flatnonzero(labels >= 0)
+        member_labels = labels[members]
+        member_weights = weights[members]
         
-        centroid_x = int(round(weighted_x / total_weight))
-        centroid_y = int(round(weighted_y / total_weight))
+        weighted_sums = np.zeros((cluster_count, 2))
+        np.add.at(weighted_sums, member_labels, pts[members] * member_weights[:, None])
+        total_weights = np.bincount(member_labels, weights=member_weights, minlength=cluster_count)
+        centroids = np.rint(weighted_sums / total_weights[:, None]).astype(np.int64)
         
         # Mapear todos los puntos del cluster al centroide
-        for point_idx in cluster:
-            point_data = all_points[point_idx]
-            key = (point_data['contour_idx'], point_data['point_idx'])
-            cluster_centroids[key] = [centroid_x, centroid_y]
+        unified_pts[members] = centroids[member_labels]
     
     # 4. Aplicar unificación con eliminación agresiva de duplicados
     unified_contours = []
+    min_step = merge_distance * 0.5  # 50% de la distancia de merge
+    min_length = merge_distance * 2
     
-    for contour_idx, contour in enumerate(contours):
-        unified_contour = []
-        prev_point = None
+    for contour_idx in range(len(contours)):
+        # Puntos del contorno ya reemplazados por su centroide cuando pertenecen a un cluster
+        contour_pts = unified_pts[offsets[contour_idx]:offsets[contour_idx + 1]]
+        if len(contour_pts) == 0:
+            continue
         
-        for point_idx, original_point in enumerate(contour):
-            key = (contour_idx, point_idx)
-            
-            # Usar centroide si el punto está en un cluster
-            if key in cluster_centroids:
-                new_point = cluster_centroids[key]
-            else:
-                new_point = [original_point[0], original_point[1]]
-            
-            # NUEVA OPTIMIZACIÓN: Eliminar duplicados consecutivos con tolerancia más estricta
-            if prev_point is None:
-                unified_contour.append(new_point)
-                prev_point = new_point
-            else:
-                distance_to_prev = math.sqrt(
-                    (new_point[0] - prev_point[0])**2 + 
-                    (new_point[1] - prev_point[1])**2
-                )
-                
-                # Solo agregar si está suficientemente lejos del punto anterior
-                if distance_to_prev >= merge_distance * 0.5:  # 50% de la distancia de merge
-                    unified_contour.append(new_point)
-                    prev_point = new_point
+        # Eliminar duplicados consecutivos: solo conservar puntos suficientemente lejos del anterior
+        steps = np.hypot(*np.diff(contour_pts, axis=0).T)
+        keep = np.concatenate(([True], steps >= min_step))
+        # La máscara vectorizada equivale a comparar con el último punto conservado
+        # solo si todo lo descartado son duplicados exactos; si no, recorrer en orden
+        if np.any(steps[~keep[1:]] > 0):
+            keep = _keep_spaced_points(contour_pts, min_step)
+        unified_contour = contour_pts[keep]
         
         # Validación final del contorno
         if len(unified_contour) >= 2:
             # Verificar que el contorno no sea degenerado
-            total_length = 0
-            for i in range(len(unified_contour) - 1):
-                p1 = unified_contour[i]
-                p2 = unified_contour[i + 1]
-                total_length += math.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
+            total_length = np.hypot(*np.diff(unified_contour, axis=0).T).sum()
             
             # Solo mantener contornos con longitud significativa
-            if total_length >= merge_distance * 2:
-                unified_contours.append(unified_contour)
+            if total_length >= min_length:
+                unified_contours.append(unified_contour.tolist())
             else:
-                print(f"⚠️ Contorno {contour_idx} descartado por longitud insuficiente: {total_length:.1f}px")
+                logger.debug("⚠️ Contorno %d descartado por longitud insuficiente: %.1fpx", contour_idx, total_length)
     
     reduction_ratio = (len(contours) - len(unified_contours)) / len(contours) * 100
-    print(f"✅ Unificación OPTIMIZADA completada:")
-    print(f"   - Contornos: {len(contours)} → {len(unified_contours)} ({reduction_ratio:.1f}% reducción)")
-    print(f"   - Clusters eliminados: {len(clusters)}")
+    logger.info(
+        "✅ Unificación OPTIMIZADA completada: contornos %d → %d (%.1f%% reducción), clusters eliminados: %d",
+        len(contours), len(unified_contours), reduction_ratio, cluster_count
+    )
     
     return unified_contours
 
@@ -263,45 +332,49 @@ def merge_nearby_endpoints(contours: List[List[List[int]]], image_shape: Tuple[i
     image_diagonal = math.sqrt(image_width**2 + image_height**2)
     merge_distance = image_diagonal * merge_distance_percent
 
-    print(f"🔗 Fusionando extremos cercanos con distancia relativa: {merge_distance_percent*100:.3f}% de la diagonal ({merge_distance:.1f}px)")
-    if len(contours) < 2:
-        return contours
-    
-    print(f"🔗 Fusionando extremos cercanos con distancia máxima: {merge_distance}px")
+    logger.info("🔗 Fusionando extremos cercanos con distancia relativa: %.3f%% de la diagonal (%.1fpx)", merge_distance_percent * 100, merge_distance)
     
-    # Recolectar información de extremos
-    endpoints = []  # Lista de (x, y, contour_idx, is_start)
+    # Recolectar información de extremos: coordenadas, contorno y si es el inicio
+    endpoints = []
+    endpoint_contours = []
+    endpoint_is_start = []
     
     for contour_idx, contour in enumerate(contours):
         if len(contour) >= 2:
             # Extremo inicial
-            start_point = contour[0]
-            endpoints.append((start_point[0], start_point[1], contour_idx, True))
+            endpoints.append(contour[0][:2])
+            endpoint_contours.append(contour_idx)
+            endpoint_is_start.append(True)
             
             # Extremo final
-            end_point = contour[-1]
-            endpoints.append((end_point[0], end_point[1], contour_idx, False))
+            endpoints.append(contour[-1][:2])
+            endpoint_contours.append(contour_idx)
+            endpoint_is_start.append(False)
+    
+    endpoints = np.array(endpoints, dtype=np.float64).reshape(-1, 2)
+    endpoint_contours = np.array(endpoint_contours, dtype=np.int64)
+    
+    # Buscar pares de extremos cercanos con un KD-tree (búsqueda en C)
+    pairs = cKDTree(endpoints).query_pairs(merge_distance, output_type='ndarray')
+    # No fusionar extremos del mismo contorno
+    pairs = pairs[endpoint_contours[pairs[:, 0]] != endpoint_contours[pairs[:, 1]]]
+    # Orden por (i, j): cada extremo se empareja con el primer candidato libre
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    distances = np.linalg.norm(endpoints[pairs[:, 0]] - endpoints[pairs[:, 1]], axis=1)
     
-    # Buscar pares de extremos cercanos
     merge_pairs = []
     used_endpoints = set()
     
-    for i, (x1, y1, c1, is_start1) in enumerate(endpoints):
-        if i in used_endpoints:
+    for (i, j), distance in zip(pairs.tolist(), distances.tolist()):
+        if i in used_endpoints or j in used_endpoints:
             continue
-            
-        for j, (x2, y2, c2, is_start2) in enumerate(endpoints[i+1:], i+1):
-            if j in used_endpoints or c1 == c2:  # No fusionar extremos del mismo contorno
-                continue
-                
-            distance = math.sqrt((x1 - x2)**2 + (y1 - y2)**2)
-            if distance <= merge_distance:
-                merge_pairs.append(((c1, is_start1), (c2, is_start2), distance))
-                used_endpoints.add(i)
-                used_endpoints.add(j)
-                break
+        
+        c1, c2 = int(endpoint_contours[i]), int(endpoint_contours[j])
+        merge_pairs.append(((c1, endpoint_is_start[i]), (c2, endpoint_is_start[j]), distance))
+        used_endpoints.add(i)
+        used_endpoints.add(j)
     
-    print(f"🎯 Encontrados {len(merge_pairs)} pares de extremos para fusionar")
+    logger.info("🎯 Encontrados %d pares de extremos para fusionar", len(merge_pairs))
     
     # Aplicar fusiones (implementación básica - conectar contornos)
     merged_contours = list(contours)  # Copia inicial
@@ -320,7 +393,7 @@ def merge_nearby_endpoints(contours: List[List[List[int]]], image_shape: Tuple[i
         if not contour1 or not contour2:
             continue
         
-        print(f"🔗 Fusionando contornos {c1} y {c2} (distancia: {distance:.1f}px)")
+        logger.debug("🔗 Fusionando contornos %d y %d (distancia: %.1fpx)", c1, c2, distance)
         
         # Determinar cómo conectar los contornos
         try:
@@ -342,65 +415,54 @@ def merge_nearby_endpoints(contours: List[List[List[int]]], image_shape: Tuple[i
             merged_contours[c2] = None  # Marcar para eliminación
             
         except Exception as e:
-            print(f"⚠️ Error fusionando contornos {c1} y {c2}: {e}")
+            logger.warning("⚠️ Error fusionando contornos %d y %d: %s", c1, c2, e)
     
     # Filtrar contornos marcados como None
     final_contours = [c for c in merged_contours if c is not None and len(c) >= 2]
     
-    print(f"✅ Fusión de extremos completada: {len(contours)} → {len(final_contours)} contornos")
+    logger.info("✅ Fusión de extremos completada: %d → %d contornos", len(contours), len(final_contours))
     return final_contours
 
-def calculate_polygon_angles(polygon: List[List[int]]) -> List[float]:
-    """Calcula todos los ángulos internos de un polígono en grados."""
-    if len(polygon) < 3:
-        return []
-    
-    angles = []
-    n = len(polygon)
-    
-    for i in range(n):
-        # Obtener tres puntos consecutivos
-        p1 = polygon[i-1]
-        p2 = polygon[i]
-        p3 = polygon[(i+1) % n]
-        
-        # Vectores desde el punto central
-        v1 = np.array([p1[0] - p2[0], p1[1] - p2[1]])
-        v2 = np.array([p3[0] - p2[0], p3[1] - p2[1]])
-        
-        # Calcular el ángulo usando producto punto
-        cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
-        cos_angle = np.clip(cos_angle, -1.0, 1.0)  # Evitar errores de precisión
-        angle_rad = np.arccos(cos_angle)
-        angle_deg = math.degrees(angle_rad)
-        
-        angles.append(angle_deg)
+def _polygon_cosines(polygon: List[List[int]]) -> np.ndarray:
+    """Calcula el coseno de cada ángulo interno de un polígono."""
+    points = np.asarray(polygon, dtype=np.float64)
+    
+    # Vectores desde cada vértice hacia el anterior y el siguiente
+    v1 = np.roll(points, 1, axis=0) - points
+    v2 = np.roll(points, -1, axis=0) - points
     
-    return angles
+    # Calcular todos los cosenos usando producto punto
+    cos_angles = np.einsum('ij,ij->i', v1, v2) / (np.linalg.norm(v1, axis=1) * np.linalg.norm(v2, axis=1))
+    return np.clip(cos_angles, -1.0, 1.0)  # Evitar errores de precisión
 
-def is_valid_sublot(polygon: List[List[int]], cfg: Dict) -> bool:
+def is_valid_sublot(polygon: List[List[int]], cfg: Dict, area: Optional[float] = None) -> bool:
     """Valida si un polígono es un sublote válido (3-7 vértices, ángulos > min_angle)."""
     # Verificar número de vértices
     if len(polygon) < 3 or len(polygon) > 7:
         return False
     
     # Verificar que el área sea suficiente (evitar polígonos muy pequeños)
-    vertices_np = np.array(polygon, dtype=np.int32)
-    area = cv2.contourArea(vertices_np)
+    if area is None:
+        vertices_np = np.array(polygon, dtype=np.int32)
+        area = cv2.contourArea(vertices_np)
     min_sublot_area = cfg.get("min_sublot_area", 500)
     if area < min_sublot_area:
         return False
     
-    # Verificar ángulos mínimos
+    # Verificar ángulos mínimos: un coseno mayor equivale a un ángulo menor,
+    # así que se compara contra cos(min_angle) sin calcular arccos
     min_angle = cfg.get("min_angle", 40.0)
-    angles = calculate_polygon_angles(polygon)
-    if any(angle < min_angle for angle in angles):
+    cos_threshold = math.cos(math.radians(min_angle))
+    if np.any(_polygon_cosines(polygon) > cos_threshold):
         return False
     
     return True
 
-def classify_contours(contours: List[np.ndarray], hierarchy: np.ndarray, cfg: Dict) -> Dict[str, List[List[List[int]]]]:
-    """Clasifica contornos en externos e internos (sublotes)."""
+def classify_contours(contours: List[np.ndarray], hierarchy: np.ndarray, cfg: Dict, areas: Optional[np.ndarray] = None) -> Dict[str, List[List[List[int]]]]:
+    """
+    Clasifica contornos en externos e internos (sublotes).
+    Si se reciben las áreas ya calculadas de cada contorno, se reutilizan al validar sublotes.
+    """
     external_contours = []
     internal_contours = []
     
@@ -416,7 +478,8 @@ def classify_contours(contours: List[np.ndarray], hierarchy: np.ndarray, cfg: Di
                 if hierarchy[0][i][3] == -1:  # Sin padre = contorno externo
                     external_contours.append(polygon)
                 else:  # Tiene padre = contorno interno potencial
-                    if is_valid_sublot(polygon, cfg):
+                    area = areas[i] if areas is not None else None
+                    if is_valid_sublot(polygon, cfg, area):
                         internal_contours.append(polygon)
     
     return {
@@ -425,22 +488,37 @@ def classify_contours(contours: List[np.ndarray], hierarchy: np.ndarray, cfg: Di
     }
 
 def procesar_imagen(archivo, cfg):
-    # Detectar si es PDF o imagen
     contenido = archivo.read()
-    if archivo.name.lower().endswith('.pdf'):
-        pages = convert_from_bytes(contenido, dpi=600, first_page=1, last_page=1)
-        img_pil = pages[0].convert('RGB')
-        img_np = np.array(img_pil)
-        img_np = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
-    else:
-        img_pil = Image.open(io.BytesIO(contenido)).convert('RGB')
-        img_np = np.array(img_pil)
-        img_np = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
-    
     archivo.close()
+    return procesar_contenido(contenido, archivo.name, cfg)
 
-    # Preprocesamiento de la imagen
-    gray = cv2.cvtColor(img_np, cv2.COLOR_BGR2GRAY)
+def procesar_contenido(contenido: bytes, nombre: str, cfg: Dict) -> Dict[str, List[List[List[int]]]]:
+    """Extrae los vectores de un plano a partir de los bytes del archivo (imagen o PDF)."""
+    # Detectar si es PDF o imagen
+    if nombre.lower().endswith('.pdf'):
+        pdf_dpi = cfg.get("pdf_dpi", 300)
+        pages = convert_from_bytes(contenido, dpi=pdf_dpi, first_page=1, last_page=1)
+        gray = np.array(pages[0].convert('L'))
+        # Los umbrales de área están calibrados en píxeles a PDF_REFERENCE_DPI:
+        # escalarlos con el cuadrado de la resolución para no descartar lotes pequeños
+        area_scale = (pdf_dpi / PDF_REFERENCE_DPI) ** 2
+        cfg = {
+            **cfg,
+            "min_contour_area": cfg["min_contour_area"] * area_scale,
+            "min_sublot_area": cfg.get("min_sublot_area", 500) * area_scale,
+        }
+    else:
+        # Decodificar con OpenCV directamente desde los bytes; PIL solo para formatos que OpenCV no soporta.
+        # Se decodifica a color y luego a gris: IMREAD_GRAYSCALE usa la conversión de libpng,
+        # que difiere bastante de cvtColor en PNG con canal alfa
+        buffer = np.frombuffer(contenido, dtype=np.uint8)
+        img_bgr = cv2.imdecode(buffer, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION) if buffer.size else None
+        if img_bgr is not None:
+            gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = np.array(Image.open(io.BytesIO(contenido)).convert('L'))
+
+    # Preprocesamiento de la imagen (ya en escala de grises)
     blurred = cv2.GaussianBlur(gray, (cfg["blur"], cfg["blur"]), 0)
     clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
     contrast = clahe.apply(blurred)
@@ -453,30 +531,26 @@ def procesar_imagen(archivo, cfg):
     # Usar RETR_TREE para obtener jerarquía de contornos (externos e internos)
     contours, hierarchy = cv2.findContours(edges_morph, cv2.RETR_TREE, cv2.CHAIN_APPROX_TC89_KCOS)
     
-    # Filtrar contornos por área mínima
-    filtered_contours = []
-    filtered_hierarchy = []
+    # Filtrar contornos por área mínima (áreas calculadas una sola vez y reutilizadas)
+    areas = np.fromiter((cv2.contourArea(c) for c in contours), dtype=np.float64, count=len(contours))
+    mask = areas > cfg["min_contour_area"]
+    filtered_contours = [contour for contour, keep in zip(contours, mask) if keep]
+    filtered_areas = areas[mask]
     
-    for i, contour in enumerate(contours):
-        if cv2.contourArea(contour) > cfg["min_contour_area"]:
-            filtered_contours.append(contour)
-            if hierarchy is not None:
-                filtered_hierarchy.append(hierarchy[0][i])
-    
-    # Convertir la jerarquía filtrada al formato numpy esperado
-    if filtered_hierarchy:
-        filtered_hierarchy = np.array([filtered_hierarchy])
+    # Mantener la jerarquía filtrada en el formato numpy esperado (1, N, 4)
+    if hierarchy is not None:
+        filtered_hierarchy = hierarchy[:, mask]
     else:
-        filtered_hierarchy = np.array([[]])
+        filtered_hierarchy = np.empty((1, 0, 4), dtype=np.int32)
     
     # Clasificar contornos en externos e internos
-    classified_contours = classify_contours(filtered_contours, filtered_hierarchy, cfg)
+    classified_contours = classify_contours(filtered_contours, filtered_hierarchy, cfg, filtered_areas)
     
     # Simplificar los contornos clasificados
     epsilon = cfg.get("epsilon", 2.0)
     
     # Usar distancias relativas al tamaño de la imagen para unificación y fusión
-    image_shape = img_np.shape[:2]  # (height, width)
+    image_shape = gray.shape[:2]  # (height, width)
     
     # Unificar puntos cercanos en bordes externos con algoritmo optimizado
     merge_distance_percent = cfg.get("merge_distance_percent", 0.005)  # 0.5% de la diagonal
@@ -489,14 +563,17 @@ def procesar_imagen(archivo, cfg):
     # También unificar puntos en sublotes con parámetros más estrictos
     unified_sublots = unify_close_points(classified_contours['sublotes'], image_shape, merge_distance_percent * 0.8)
     
+    use_python_rdp = cfg.get("use_python_rdp", False)
     result = {
         'bordes_externos': simplify_contours(
             [np.array(contour) for contour in merged_borders], 
-            epsilon
+            epsilon,
+            use_python_rdp
         ),
         'sublotes': simplify_contours(
             [np.array(contour) for contour in unified_sublots], 
-            epsilon
+            epsilon,
+            use_python_rdp
         )
     }
     
@@ -0,0 +1,11 @@
+import json
+
+
+class CompactJSONEncoder(json.JSONEncoder):
+    """
+    Codifica JSON sin espacios tras ',' y ':'.
+    Los JSONField de coordenadas son listas de pares [x, y]; en bases que guardan
+    el JSON como texto (SQLite) los separadores compactos reducen ~1/6 el tamaño.
+    """
+    item_separator = ','
+    key_separator = ':'
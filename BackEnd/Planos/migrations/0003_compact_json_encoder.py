@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-15 09:33
+
+import Planos.encoders
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("Planos", "0002_plano_bordes_externos_plano_imagen_url_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="plano",
+            name="bordes_externos",
+            field=models.JSONField(
+                default=list, encoder=Planos.encoders.CompactJSONEncoder
+            ),
+        ),
+        migrations.AlterField(
+            model_name="plano",
+            name="sublotes",
+            field=models.JSONField(
+                default=list, encoder=Planos.encoders.CompactJSONEncoder
+            ),
+        ),
+        migrations.AlterField(
+            model_name="plano",
+            name="vectores",
+            field=models.JSONField(
+                default=list, encoder=Planos.encoders.CompactJSONEncoder
+            ),
+        ),
+    ]
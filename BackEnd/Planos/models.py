@@ -1,10 +1,11 @@
 from django.db import models
+from .encoders import CompactJSONEncoder
 
 class Plano(models.Model):
     nombre = models.CharField(max_length=255)
-    vectores = models.JSONField(default=list)  # Mantener para retrocompatibilidad
-    bordes_externos = models.JSONField(default=list)  # Nuevos campos estructurados
-    sublotes = models.JSONField(default=list)
+    vectores = models.JSONField(default=list, encoder=CompactJSONEncoder)  # Mantener para retrocompatibilidad
+    bordes_externos = models.JSONField(default=list, encoder=CompactJSONEncoder)  # Nuevos campos estructurados
+    sublotes = models.JSONField(default=list, encoder=CompactJSONEncoder)
     imagen_url = models.URLField(blank=True, null=True)  # Para guardar la URL de la imagen si es necesario
     creado = models.DateTimeField(auto_now_add=True)
     
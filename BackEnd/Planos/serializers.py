@@ -13,4 +13,10 @@ class PlanoSerializer(serializers.ModelSerializer):
             # Esto mantiene retrocompatibilidad con datos antiguos
             pass
         
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+class PlanoListSerializer(serializers.ModelSerializer):
+    """Resumen de plano para listados: omite los JSONField de vectores."""
+    class Meta:
+        model = Plano
+        fields = ['id', 'nombre', 'imagen_url', 'creado']
\ No newline at end of file
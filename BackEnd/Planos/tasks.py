@@ -0,0 +1,12 @@
+import base64
+
+from celery import shared_task
+
+from .Services.extractor import procesar_contenido
+
+
+@shared_task
+def procesar_imagen_task(contenido_b64, nombre, cfg):
+    """Procesa un plano en un worker de Celery; el archivo llega codificado en base64."""
+    contenido = base64.b64decode(contenido_b64)
+    return procesar_contenido(contenido, nombre, cfg)
@@ -1,3 +1,261 @@
-from django.test import TestCase
+import base64
+import math
+from unittest import mock
 
-# Create your tests here.
+import cv2
+import numpy as np
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .Services import extractor
+from .tasks import procesar_imagen_task
+from .views import CFG
+
+IMAGE_SHAPE = (800, 1000)
+
+def _plano_png():
+    """Plano sintético: una manzana rectangular dividida en seis lotes."""
+    imagen = np.full((600, 800), 255, dtype=np.uint8)
+    cv2.rectangle(imagen, (100, 100), (700, 500), 0, 3)
+    for x in (300, 500):
+        cv2.line(imagen, (x, 100), (x, 500), 0, 3)
+    cv2.line(imagen, (100, 300), (700, 300), 0, 3)
+    return cv2.imencode('.png', imagen)[1].tobytes()
+
+def _contornos_aleatorios(rng):
+    """Polilíneas cortas con puntos cercanos entre sí, como las que produce la simplificación."""
+    contornos = []
+    for _ in range(rng.integers(1, 30)):
+        base = rng.integers(0, 800, 2)
+        pasos = rng.integers(-15, 16, (rng.integers(1, 25), 2))
+        contornos.append((base + np.cumsum(pasos, axis=0)).tolist())
+    return contornos
+
+def _unify_referencia(contours, image_shape, merge_distance_percent):
+    """Versión de fuerza bruta (O(n²)) de unify_close_points, sin índice espacial."""
+    merge_distance = math.sqrt(image_shape[0] ** 2 + image_shape[1] ** 2) * merge_distance_percent
+    puntos = [(p[0], p[1], ci, pi) for ci, c in enumerate(contours) for pi, p in enumerate(c)]
+    usados = [False] * len(puntos)
+    centroides = {}
+
+    for i, (x1, y1, _, _) in enumerate(puntos):
+        if usados[i]:
+            continue
+        usados[i] = True
+        cluster = [i]
+        for j, (x2, y2, _, _) in enumerate(puntos):
+            if not usados[j] and math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2) <= merge_distance:
+                usados[j] = True
+                cluster.append(j)
+        if len(cluster) < 2:
+            continue
+
+        # Los extremos de cada contorno pesan el doble
+        pesos = [2.0 if puntos[k][3] in (0, len(contours[puntos[k][2]]) - 1) else 1.0 for k in cluster]
+        cx = int(round(sum(puntos[k][0] * w for k, w in zip(cluster, pesos)) / sum(pesos)))
+        cy = int(round(sum(puntos[k][1] * w for k, w in zip(cluster, pesos)) / sum(pesos)))
+        for k in cluster:
+            centroides[puntos[k][2], puntos[k][3]] = [cx, cy]
+
+    resultado = []
+    for ci, contour in enumerate(contours):
+        unificado = []
+        for pi, p in enumerate(contour):
+            nuevo = centroides.get((ci, pi), [p[0], p[1]])
+            if not unificado or math.dist(nuevo, unificado[-1]) >= merge_distance * 0.5:
+                unificado.append(nuevo)
+        longitud = sum(math.dist(a, b) for a, b in zip(unificado, unificado[1:]))
+        if len(unificado) >= 2 and longitud >= merge_distance * 2:
+            resultado.append(unificado)
+    return resultado
+
+def _merge_referencia(contours, image_shape, merge_distance_percent):
+    """Versión de fuerza bruta (O(n²)) de merge_nearby_endpoints."""
+    if len(contours) < 2:
+        return contours
+    merge_distance = math.sqrt(image_shape[0] ** 2 + image_shape[1] ** 2) * merge_distance_percent
+    extremos = []
+    for ci, c in enumerate(contours):
+        if len(c) >= 2:
+            extremos.append((c[0][0], c[0][1], ci, True))
+            extremos.append((c[-1][0], c[-1][1], ci, False))
+
+    pares, usados = [], set()
+    for i, (x1, y1, c1, inicio1) in enumerate(extremos):
+        if i in usados:
+            continue
+        for j in range(i + 1, len(extremos)):
+            x2, y2, c2, inicio2 = extremos[j]
+            if j in usados or c1 == c2:
+                continue
+            distancia = math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
+            if distancia <= merge_distance:
+                pares.append(((c1, inicio1), (c2, inicio2), distancia))
+                usados.update((i, j))
+                break
+
+    fusionados = list(contours)
+    for (c1, inicio1), (c2, inicio2), _ in sorted(pares, key=lambda par: par[2]):
+        a, b = fusionados[c1], fusionados[c2]
+        if not a or not b:
+            continue
+        if inicio1 and inicio2:
+            fusionados[c1] = list(reversed(a)) + b
+        elif inicio1:
+            fusionados[c1] = b + a
+        elif inicio2:
+            fusionados[c1] = a + b
+        else:
+            fusionados[c1] = a + list(reversed(b))
+        fusionados[c2] = None
+    return [c for c in fusionados if c is not None and len(c) >= 2]
+
+class UnificacionPuntosTests(SimpleTestCase):
+    def test_unify_coincide_con_la_referencia(self):
+        rng = np.random.default_rng(1)
+        for _ in range(100):
+            contornos = _contornos_aleatorios(rng)
+            self.assertEqual(
+                extractor.unify_close_points(contornos, IMAGE_SHAPE, 0.01),
+                _unify_referencia(contornos, IMAGE_SHAPE, 0.01)
+            )
+
+    def test_merge_coincide_con_la_referencia(self):
+        rng = np.random.default_rng(2)
+        for _ in range(100):
+            contornos = _contornos_aleatorios(rng)
+            self.assertEqual(
+                extractor.merge_nearby_endpoints(contornos, IMAGE_SHAPE, 0.01),
+                _merge_referencia(contornos, IMAGE_SHAPE, 0.01)
+            )
+
+    def test_listas_vacias(self):
+        self.assertEqual(extractor.unify_close_points([], IMAGE_SHAPE), [])
+        self.assertEqual(extractor.merge_nearby_endpoints([], IMAGE_SHAPE), [])
+
+class SimplificacionTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.contornos = [
+            np.cumsum(rng.integers(-5, 6, (int(rng.integers(2, 200)), 1, 2)), axis=0).astype(np.int32)
+            for _ in range(extractor._MIN_CONTOURS_PARALLEL * 32)
+        ]
+
+    def test_rdp_iterativo_conserva_extremos_y_puntos_lejanos(self):
+        puntos = np.array([[0, 0], [1, 0.1], [2, 5], [3, 0.1], [4, 0]])
+        np.testing.assert_array_equal(
+            extractor.ramer_douglas_peucker(puntos, 1.0),
+            [[0, 0], [2, 5], [4, 0]]
+        )
+
+    def test_rdp_numba_coincide_con_numpy(self):
+        if extractor._get_rdp_numba() is None:
+            self.skipTest('Numba no está instalado')
+        for contorno in self.contornos:
+            esperado = extractor.ramer_douglas_peucker(contorno.reshape(-1, 2), CFG['epsilon'])
+            np.testing.assert_array_equal(
+                extractor._simplify_contour(contorno, CFG['epsilon'], use_python_rdp=True),
+                esperado
+            )
+
+    def test_simplificacion_en_paralelo_coincide_con_secuencial(self):
+        for use_python_rdp in (False, True):
+            esperado = [
+                c.astype(np.int64).tolist()
+                for c in (extractor._simplify_contour(c, CFG['epsilon'], use_python_rdp) for c in self.contornos)
+                if len(c) >= 2
+            ]
+            with mock.patch.object(extractor, 'SIMPLIFY_THREADS', 2):
+                self.assertEqual(
+                    extractor.simplify_contours(self.contornos, CFG['epsilon'], use_python_rdp),
+                    esperado
+                )
+
+class ValidacionSublotesTests(SimpleTestCase):
+    def test_rectangulo_es_sublote_valido(self):
+        self.assertTrue(extractor.is_valid_sublot([[0, 0], [100, 0], [100, 50], [0, 50]], CFG))
+
+    def test_triangulo_agudo_no_es_valido(self):
+        self.assertFalse(extractor.is_valid_sublot([[0, 0], [400, 0], [400, 20]], CFG))
+
+    def test_area_insuficiente_no_es_valida(self):
+        self.assertFalse(extractor.is_valid_sublot([[0, 0], [10, 0], [10, 10], [0, 10]], CFG))
+
+class ProcesarPlanoAPITests(APITestCase):
+    url = reverse('procesar-plano')
+
+    def _archivo(self):
+        return SimpleUploadedFile('plano.png', _plano_png(), content_type='image/png')
+
+    def _assert_resultado(self, data):
+        for clave in ('vectores', 'bordes_externos', 'sublotes'):
+            self.assertEqual(data[f'total_{clave}'], len(data[clave]))
+        self.assertGreater(data['total_vectores'], 0)
+
+    def test_requiere_archivo(self):
+        response = self.client.post(self.url, {}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sync_procesa_en_la_peticion(self):
+        with mock.patch('Planos.views.procesar_imagen_task.delay') as delay:
+            response = self.client.post(f'{self.url}?sync=1', {'archivo': self._archivo()}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self._assert_resultado(response.data)
+        delay.assert_not_called()
+
+    def test_encola_y_devuelve_job_id(self):
+        tarea = mock.Mock(id='job-123')
+        tarea.ready.return_value = False
+        with mock.patch('Planos.views.procesar_imagen_task.delay', return_value=tarea) as delay:
+            response = self.client.post(self.url, {'archivo': self._archivo()}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {'job_id': 'job-123'})
+        contenido_b64, nombre, cfg = delay.call_args.args
+        self.assertEqual(base64.b64decode(contenido_b64), _plano_png())
+        self.assertEqual((nombre, cfg), ('plano.png', CFG))
+
+    def test_tarea_eager_devuelve_el_resultado(self):
+        with mock.patch(
+            'Planos.views.procesar_imagen_task.delay',
+            side_effect=lambda *args: procesar_imagen_task.apply(args=args)
+        ):
+            response = self.client.post(self.url, {'archivo': self._archivo()}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self._assert_resultado(response.data)
+
+class EstadoProcesamientoAPITests(APITestCase):
+    def _consultar(self, tarea):
+        with mock.patch('Planos.views.AsyncResult', return_value=tarea) as async_result:
+            response = self.client.get(reverse('estado-procesamiento', args=['job-123']))
+        async_result.assert_called_once_with('job-123')
+        return response
+
+    def test_pendiente(self):
+        tarea = mock.Mock(id='job-123', state='PENDING')
+        tarea.successful.return_value = False
+        tarea.failed.return_value = False
+        response = self._consultar(tarea)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {'job_id': 'job-123', 'estado': 'PENDING'})
+
+    def test_terminado(self):
+        contenido_b64 = base64.b64encode(_plano_png()).decode('ascii')
+        response = self._consultar(procesar_imagen_task.apply(args=(contenido_b64, 'plano.png', CFG)))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(response.data['total_vectores'], 0)
+
+    def test_fallido(self):
+        contenido_b64 = base64.b64encode(b'no es una imagen').decode('ascii')
+        response = self._consultar(procesar_imagen_task.apply(args=(contenido_b64, 'plano.png', CFG)))
+
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertIn('detalle', response.data)
@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('procesar/', views.ProcesarPlanoAPIView.as_view(), name='procesar-plano'),
+    path('procesar/<str:job_id>/', views.EstadoProcesamientoAPIView.as_view(), name='estado-procesamiento'),
     path('guardar/', views.GuardarPlanoAPIView.as_view(), name='guardar-plano'),
     path('listar/', views.ListarPlanosAPIView.as_view(), name='listar-planos'),
     path('<int:pk>/', views.ObtenerPlanoAPIView.as_view(), name='obtener-plano'),
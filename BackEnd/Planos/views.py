@@ -1,8 +1,12 @@
+import base64
+
+from celery.result import AsyncResult
 from rest_framework import generics, views, status
 from rest_framework.response import Response
 from .models import Plano
-from .serializers import PlanoSerializer
+from .serializers import PlanoSerializer, PlanoListSerializer
 from .Services.extractor import procesar_imagen
+from .tasks import procesar_imagen_task
 
 CFG = {
     "blur": 3,
@@ -12,10 +16,35 @@ CFG = {
     "min_contour_area": 1000,
     "epsilon": 2.0,  # Simplificación de contornos
     "min_sublot_area": 500,  # Área mínima para sublotes
-    "min_angle": 40.0  # Ángulo mínimo para sublotes válidos
+    "min_angle": 40.0,  # Ángulo mínimo para sublotes válidos
+    "pdf_dpi": 300,  # Resolución de rasterizado de PDF
+    "use_python_rdp": False  # Usar RDP propio en lugar de cv2.approxPolyDP
 }
 
-# Subir imagen y procesar
+def _respuesta_procesamiento(resultado):
+    # La nueva estructura incluye clasificación de vectores
+    return {
+        'vectores': resultado.get('vectores', []),  # Retrocompatibilidad
+        'bordes_externos': resultado.get('bordes_externos', []),
+        'sublotes': resultado.get('sublotes', []),
+        'total_vectores': len(resultado.get('vectores', [])),
+        'total_bordes_externos': len(resultado.get('bordes_externos', [])),
+        'total_sublotes': len(resultado.get('sublotes', []))
+    }
+
+def _respuesta_tarea(tarea):
+    if tarea.successful():
+        return Response(_respuesta_procesamiento(tarea.result), status=status.HTTP_200_OK)
+    
+    if tarea.failed():
+        return Response({
+            'error': 'Error al procesar la imagen', 
+            'detalle': str(tarea.result)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    return Response({'job_id': tarea.id, 'estado': tarea.state}, status=status.HTTP_202_ACCEPTED)
+
+# Subir imagen y encolar su procesamiento (?sync=1 procesa en la misma petición)
 class ProcesarPlanoAPIView(views.APIView):
     def post(self, request):
         archivo = request.FILES.get('archivo')
@@ -23,25 +52,30 @@ class ProcesarPlanoAPIView(views.APIView):
             return Response({'error': 'Archivo requerido'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            resultado = procesar_imagen(archivo, CFG)
-            
-            # La nueva estructura incluye clasificación de vectores
-            response_data = {
-                'vectores': resultado.get('vectores', []),  # Retrocompatibilidad
-                'bordes_externos': resultado.get('bordes_externos', []),
-                'sublotes': resultado.get('sublotes', []),
-                'total_vectores': len(resultado.get('vectores', [])),
-                'total_bordes_externos': len(resultado.get('bordes_externos', [])),
-                'total_sublotes': len(resultado.get('sublotes', []))
-            }
+            if request.query_params.get('sync') == '1':
+                resultado = procesar_imagen(archivo, CFG)
+                return Response(_respuesta_procesamiento(resultado), status=status.HTTP_200_OK)
             
-            return Response(response_data, status=status.HTTP_200_OK)
+            contenido = archivo.read()
+            archivo.close()
+            tarea = procesar_imagen_task.delay(base64.b64encode(contenido).decode('ascii'), archivo.name, CFG)
             
         except Exception as e:
             return Response({
                 'error': 'Error al procesar la imagen', 
                 'detalle': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        # Con CELERY_TASK_ALWAYS_EAGER la tarea ya terminó: responder el resultado directamente
+        if tarea.ready():
+            return _respuesta_tarea(tarea)
+        
+        return Response({'job_id': tarea.id}, status=status.HTTP_202_ACCEPTED)
+
+# Consultar el estado de un procesamiento encolado
+class EstadoProcesamientoAPIView(views.APIView):
+    def get(self, request, job_id):
+        return _respuesta_tarea(AsyncResult(job_id))
     
 # Guardar vectores editados
 class GuardarPlanoAPIView(generics.CreateAPIView):
@@ -50,8 +84,9 @@ class GuardarPlanoAPIView(generics.CreateAPIView):
     
 # Listar planos
 class ListarPlanosAPIView(generics.ListAPIView):
-    queryset = Plano.objects.all()
-    serializer_class = PlanoSerializer
+    # El listado solo necesita el resumen: no cargar los JSONField pesados
+    queryset = Plano.objects.only(*PlanoListSerializer.Meta.fields)
+    serializer_class = PlanoListSerializer
 
 # Obtener plano por ID
 class ObtenerPlanoAPIView(generics.RetrieveAPIView):
@@ -97,7 +97,7 @@ export const PlanoProvider = ({ children }) => {
   const obtenerLotes = useCallback(async () => {
     setIsLoading(true);
     try {
-      const data = await lotesService.obtenerLotes();
+      const data = await lotesService.obtenerLotes(true);
       setLotes(data);
     } catch (error) {
       console.error('Error al obtener los lotes:', error);
@@ -29,7 +29,7 @@ function PlanoFinalizadoPage() {
       setIsLoading(true);
       const [planoData, lotesData] = await Promise.all([
         planosService.obtenerPlano(planoId),
-        lotesService.obtenerLotes()
+        lotesService.obtenerLotes(true)
       ]);
       
       setPlano(planoData);
@@ -1,15 +1,15 @@
 import api from './config';
 
 const lotesService = {
-  // Obtener todos los lotes
-  obtenerLotes: async () => {
-    const response = await api.get('/lotes/');
+  // Obtener todos los lotes (resumen, o completos con vértices si full=true)
+  obtenerLotes: async (full = false) => {
+    const response = await api.get('/lotes/', { params: full ? { full: 1 } : {} });
     return response.data;
   },
 
   // Obtener lotes por plano
   obtenerLotesPorPlano: async (planoId) => {
-    const response = await api.get(`/lotes/?plano=${planoId}`);
+    const response = await api.get(`/lotes/?plano=${planoId}&full=1`);
     return response.data;
   },
 
@@ -1,16 +1,29 @@
 import api from './config';
 
+const INTERVALO_CONSULTA_MS = 1000;
+// Máximo de consultas de estado (~5 minutos) antes de abandonar un procesamiento encolado
+const MAX_CONSULTAS = 300;
+
 const planosService = {
-  // Procesar nuevo plano
+  // Procesar nuevo plano: el backend encola el trabajo (202) y se consulta su estado hasta terminar
   procesarPlano: async (archivo) => {
     const formData = new FormData();
     formData.append('archivo', archivo);
     
-    const response = await api.post('/planos/procesar/', formData, {
+    let response = await api.post('/planos/procesar/', formData, {
       headers: {
         'Content-Type': 'multipart/form-data',
       },
     });
+
+    const jobId = response.data.job_id;
+    for (let consulta = 0; response.status === 202; consulta++) {
+      if (consulta >= MAX_CONSULTAS) {
+        throw new Error(`El procesamiento del plano no terminó a tiempo (trabajo ${jobId})`);
+      }
+      await new Promise((resolve) => setTimeout(resolve, INTERVALO_CONSULTA_MS));
+      response = await api.get(`/planos/procesar/${jobId}/`);
+    }
     return response.data;
   },
 